@@ -2,21 +2,27 @@
 
 from __future__ import annotations
 
-import base64
+import asyncio
+import atexit
+import functools
 import json
 import logging
 import os
 import plistlib
+import queue
 import shutil
 import subprocess
 import sys
+import threading
 import time
-from datetime import datetime
+import zlib
+from concurrent.futures import ThreadPoolExecutor
 from io import BytesIO
 from pathlib import Path
 from typing import Annotated, Literal, Optional, Sequence, TypedDict
 
-from PIL import Image
+from PIL import Image, ImageChops, ImageStat, features
+from PIL import __version__ as PILLOW_VERSION
 
 try:
     from dotenv import load_dotenv
@@ -24,23 +30,62 @@ except ModuleNotFoundError:  # pragma: no cover - optional dependency guard
     def load_dotenv(*_args, **_kwargs):  # type: ignore[empty-body]
         return False
 
+try:
+    import pybase64 as _b64
+except ModuleNotFoundError:  # pragma: no cover - optional dependency guard
+    import base64 as _b64  # type: ignore[no-redef]
+
+    def _b64encode_as_string(data) -> str:
+        return _b64.b64encode(data).decode("ascii")
+
+else:
+
+    def _b64encode_as_string(data) -> str:
+        # Produces the str directly, skipping a payload-sized bytes -> str copy.
+        return _b64.b64encode_as_string(data)
+
+try:
+    import mss
+except ModuleNotFoundError:  # pragma: no cover - optional dependency guard
+    mss = None  # type: ignore[assignment]
+
+try:
+    import orjson
+except ModuleNotFoundError:  # pragma: no cover - optional dependency guard
+    orjson = None  # type: ignore[assignment]
+
+try:
+    import xxhash
+except ModuleNotFoundError:  # pragma: no cover - optional dependency guard
+    xxhash = None  # type: ignore[assignment]
+
+try:
+    import numpy as np
+except ModuleNotFoundError:  # pragma: no cover - optional dependency guard
+    np = None  # type: ignore[assignment]
+
+try:
+    from turbojpeg import (
+        TJPF_BGRX,
+        TJPF_GRAY,
+        TJPF_RGB,
+        TJPF_RGBA,
+        TJPF_RGBX,
+        TJSAMP_420,
+        TJSAMP_GRAY,
+        TurboJPEG,
+    )
+except ModuleNotFoundError:  # pragma: no cover - optional dependency guard
+    TurboJPEG = None  # type: ignore[assignment,misc]
+
 PACKAGE_ROOT = Path(__file__).resolve().parent
 PROJECT_ROOT = PACKAGE_ROOT.parent
 
-if sys.platform == "darwin":
-    try:
-        import Quartz  # type: ignore[import-not-found]
-    except Exception:  # noqa: BLE001
-        Quartz = None  # type: ignore[assignment]
-else:  # pragma: no cover - platform specific
-    Quartz = None  # type: ignore[assignment]
-
 import pyautogui
 from mcp.server.fastmcp import FastMCP
 
 SERVER_NAME = "desktop-gui-mcp"
 ENV_PREFIX = "DESKTOP_GUI_MCP"
-SCREENSHOT_FORMAT = "JPEG"
 
 load_dotenv()
 load_dotenv(dotenv_path=PROJECT_ROOT / ".env", override=False)
@@ -64,7 +109,7 @@ if _get_env_var("FAILSAFE", "1").lower() in {"0", "false", "no"}:
 _default_image_quality_raw = _get_env_var("IMAGE_QUALITY")
 if _default_image_quality_raw is not None:
     try:
-        _default_image_quality = int(_default_image_quality_raw)
+        _default_image_quality = max(5, min(95, int(_default_image_quality_raw)))
     except ValueError as exc:
         raise ValueError(
             "Environment variable DESKTOP_GUI_MCP_IMAGE_QUALITY must be an integer."
@@ -72,6 +117,34 @@ if _default_image_quality_raw is not None:
 else:
     _default_image_quality = 5
 
+_ALLOWED_SCREENSHOT_FORMATS = {"JPEG", "WEBP", "AVIF"}
+SCREENSHOT_FORMAT = _get_env_var("SCREENSHOT_FORMAT", "jpeg").upper()
+if SCREENSHOT_FORMAT not in _ALLOWED_SCREENSHOT_FORMATS:
+    raise ValueError(
+        "Environment variable DESKTOP_GUI_MCP_SCREENSHOT_FORMAT must be one of "
+        f"{sorted(fmt.lower() for fmt in _ALLOWED_SCREENSHOT_FORMATS)}."
+    )
+if SCREENSHOT_FORMAT == "AVIF":
+    try:
+        # Registers an AVIF codec on Pillow builds without native support.
+        import pillow_avif  # noqa: F401
+    except ModuleNotFoundError:  # pragma: no cover - optional dependency guard
+        pass
+    Image.init()
+    if "AVIF" not in Image.SAVE:
+        raise ValueError(
+            "DESKTOP_GUI_MCP_SCREENSHOT_FORMAT=avif requires a Pillow build with AVIF "
+            "support or the pillow-avif-plugin package (`pip install .[avif]`)."
+        )
+
+_ALLOWED_SCREENSHOT_BACKENDS = {"mss", "pyautogui"}
+_screenshot_backend = _get_env_var("SCREENSHOT_BACKEND", "mss").lower()
+if _screenshot_backend not in _ALLOWED_SCREENSHOT_BACKENDS:
+    raise ValueError(
+        "Environment variable DESKTOP_GUI_MCP_SCREENSHOT_BACKEND must be one of "
+        f"{sorted(_ALLOWED_SCREENSHOT_BACKENDS)}."
+    )
+
 _ALLOWED_COLOR_MODES = {"color", "gray", "palette"}
 _default_color_mode_raw = _get_env_var("SCREENSHOT_COLOR_MODE", "palette").lower()
 if _default_color_mode_raw not in _ALLOWED_COLOR_MODES:
@@ -92,6 +165,39 @@ if _default_palette_size_raw is not None:
 else:
     _default_palette_size = 32
 
+_screenshot_cache_ttl_raw = _get_env_var("SCREENSHOT_CACHE_TTL")
+if _screenshot_cache_ttl_raw is not None:
+    try:
+        _screenshot_cache_ttl = max(0.0, float(_screenshot_cache_ttl_raw))
+    except ValueError as exc:
+        raise ValueError(
+            "Environment variable DESKTOP_GUI_MCP_SCREENSHOT_CACHE_TTL must be numeric."
+        ) from exc
+else:
+    _screenshot_cache_ttl = 0.15
+
+_layout_cache_ttl_raw = _get_env_var("LAYOUT_CACHE_TTL")
+if _layout_cache_ttl_raw is not None:
+    try:
+        _layout_cache_ttl = max(0.0, float(_layout_cache_ttl_raw))
+    except ValueError as exc:
+        raise ValueError(
+            "Environment variable DESKTOP_GUI_MCP_LAYOUT_CACHE_TTL must be numeric."
+        ) from exc
+else:
+    _layout_cache_ttl = 5.0
+
+_screenshot_max_side_raw = _get_env_var("SCREENSHOT_MAX_SIDE")
+if _screenshot_max_side_raw is not None:
+    try:
+        _screenshot_max_side = max(0, int(_screenshot_max_side_raw))
+    except ValueError as exc:
+        raise ValueError(
+            "Environment variable DESKTOP_GUI_MCP_SCREENSHOT_MAX_SIDE must be an integer."
+        ) from exc
+else:
+    _screenshot_max_side = 0
+
 
 def _parse_bool(value: Optional[str]) -> bool:
     if value is None:
@@ -99,6 +205,24 @@ def _parse_bool(value: Optional[str]) -> bool:
     return value.lower() in {"1", "true", "yes", "on"}
 
 
+def _parse_optional_bool(value: Optional[str]) -> Optional[bool]:
+    if value is None or not value.strip():
+        return None
+    return _parse_bool(value)
+
+
+# Huffman optimisation and progressive scans cost extra encoder passes. Unless forced
+# either way, they are only used on frames large enough for the size saving to matter.
+_jpeg_optimize = _parse_optional_bool(_get_env_var("JPEG_OPTIMIZE"))
+_jpeg_progressive = _parse_optional_bool(_get_env_var("JPEG_PROGRESSIVE"))
+_JPEG_OPTIMIZE_MIN_PIXELS = 250_000
+_JPEG_PROGRESSIVE_MIN_PIXELS = 500_000
+_jpeg_ui_qtables = _parse_bool(_get_env_var("JPEG_UI_QTABLES"))
+
+# Saving and restoring the clipboard around the paste fallback costs two extra clipboard
+# round trips (subprocesses with pyperclip), so it is opt-in.
+_clipboard_preserve = _parse_bool(_get_env_var("CLIPBOARD_PRESERVE"))
+
 _debug_enabled = _parse_bool(_get_env_var("DEBUG"))
 _debug_dir: Optional[Path] = None
 _logger = logging.getLogger("desktop_gui_mcp")
@@ -111,7 +235,7 @@ if _debug_enabled:
     )
     _debug_dir = Path(debug_dir_raw).expanduser().resolve()
     _debug_dir.mkdir(parents=True, exist_ok=True)
-    log_path = _debug_dir / f"trace-{datetime.utcnow().strftime('%Y%m%d-%H%M%S')}.log"
+    log_path = _debug_dir / f"trace-{time.strftime('%Y%m%d-%H%M%S', time.gmtime())}.log"
     handler = logging.FileHandler(log_path, encoding="utf-8")
     handler.setFormatter(logging.Formatter("%(asctime)sZ %(message)s"))
     _logger.addHandler(handler)
@@ -119,6 +243,18 @@ if _debug_enabled:
     _logger.propagate = False
     _logger.debug("Debug logging enabled. Writing to %s", log_path)
 
+# Pillow-SIMD publishes ".postN" versions; report which build encodes screenshots so a
+# deployment that silently fell back to stock Pillow or plain libjpeg shows up in the trace.
+_PILLOW_SIMD = ".post" in PILLOW_VERSION
+_PILLOW_LIBJPEG_TURBO = bool(features.check_feature("libjpeg_turbo"))
+_logger.debug(
+    "Pillow %s (%s build, %s %s)",
+    PILLOW_VERSION,
+    "SIMD" if _PILLOW_SIMD else "stock",
+    "libjpeg-turbo" if _PILLOW_LIBJPEG_TURBO else "libjpeg",
+    features.version("libjpeg_turbo" if _PILLOW_LIBJPEG_TURBO else "jpg"),
+)
+
 mcp_server = FastMCP(SERVER_NAME)
 
 
@@ -135,6 +271,10 @@ def _debug_log(message: str) -> None:
 
 def _serialize_for_log(data) -> str:
     try:
+        if orjson is not None:
+            return orjson.dumps(data, default=str, option=orjson.OPT_NON_STR_KEYS).decode(
+                "utf-8"
+            )
         return json.dumps(data, default=str, ensure_ascii=False)
     except TypeError:
         return repr(data)
@@ -143,8 +283,7 @@ def _serialize_for_log(data) -> str:
 def _truncate_text(value: str, limit: int = 200) -> str:
     if len(value) <= limit:
         return value
-    remainder = len(value) - limit
-    return f"{value[:limit]}…(+{remainder} chars)"
+    return f"{value[:limit]}…(+{len(value) - limit} chars)"
 
 
 class _NoopDebugContext:
@@ -197,6 +336,9 @@ def _tool_debug_context(name: str, payload) -> _NoopDebugContext | _ActiveDebugC
     return _ActiveDebugContext(name, payload)
 
 
+_B64_PAD = b"===="
+
+
 def _debug_store_screenshot(
     base64_data: Optional[str],
     tool_name: str,
@@ -206,12 +348,62 @@ def _debug_store_screenshot(
     if not (_debug_enabled and base64_data and _debug_dir is not None):
         return
 
-    timestamp = datetime.utcnow().strftime("%Y%m%d-%H%M%S-%f")
+    now = time.time()
+    timestamp = f"{time.strftime('%Y%m%d-%H%M%S', time.gmtime(now))}-{int(now % 1 * 1e6):06d}"
     prefix = f"{tool_name}-{timestamp}"
 
-    image_path = _debug_dir / f"{prefix}.jpg"
+    media_type = base64_data[len("data:image/") : base64_data.find(";")]
+    extension = "jpg" if media_type in {"", "jpeg"} else media_type
+    image_path = _debug_dir / f"{prefix}.{extension}"
     base64_path = _debug_dir / f"{prefix}.b64"
 
+    _start_debug_writer()
+    _debug_write_queue.put((image_path, base64_path, base64_data, tool_name, metadata))
+
+
+# Screenshot artifacts are written by a daemon thread so disk I/O stays off the
+# tool call's critical path; ``None`` asks the writer to stop.
+_debug_write_queue: "queue.SimpleQueue[Optional[tuple[Path, Path, str, str, dict]]]" = (
+    queue.SimpleQueue()
+)
+_debug_writer: Optional[threading.Thread] = None
+_debug_writer_lock = threading.Lock()
+
+
+def _start_debug_writer() -> None:
+    global _debug_writer
+    with _debug_writer_lock:
+        if _debug_writer is not None:
+            return
+        _debug_writer = threading.Thread(
+            target=_debug_writer_loop, name="desktop-gui-mcp-debug-writer", daemon=True
+        )
+        _debug_writer.start()
+        atexit.register(_stop_debug_writer)
+
+
+def _stop_debug_writer() -> None:
+    if _debug_writer is None:
+        return
+    _debug_write_queue.put(None)
+    _debug_writer.join(timeout=5.0)
+
+
+def _debug_writer_loop() -> None:
+    while True:
+        item = _debug_write_queue.get()
+        if item is None:
+            return
+        _debug_write_screenshot(*item)
+
+
+def _debug_write_screenshot(
+    image_path: Path,
+    base64_path: Path,
+    base64_data: str,
+    tool_name: str,
+    metadata: dict,
+) -> None:
     try:
         base64_path.write_text(base64_data, encoding="ascii")
     except Exception as exc:  # noqa: BLE001
@@ -221,10 +413,8 @@ def _debug_store_screenshot(
         if raw_data.startswith("data:"):
             raw_data = raw_data.split(",", 1)[-1]
         normalized = raw_data.encode("ascii")
-        missing_padding = (-len(normalized)) % 4
-        if missing_padding:
-            normalized += b"=" * missing_padding
-        image_bytes = base64.b64decode(normalized, validate=False)
+        normalized += _B64_PAD[: (-len(normalized)) % 4]
+        image_bytes = _b64.b64decode(normalized, validate=False)
         image_path.write_bytes(image_bytes)
     except Exception as exc:  # noqa: BLE001
         _debug_log(
@@ -236,6 +426,46 @@ def _debug_store_screenshot(
         )
 
 
+_QUANTIZE_METHODS = {
+    "fastoctree": Image.Quantize.FASTOCTREE,
+    "mediancut": Image.Quantize.MEDIANCUT,
+    "maxcoverage": Image.Quantize.MAXCOVERAGE,
+    "libimagequant": Image.Quantize.LIBIMAGEQUANT,
+}
+# Fast octree is several times cheaper than median cut and close enough in quality
+# for UI captures; median cut or libimagequant can be selected when fidelity matters.
+_quantize_method_raw = _get_env_var("SCREENSHOT_QUANTIZE_METHOD", "fastoctree").lower()
+if _quantize_method_raw not in _QUANTIZE_METHODS:
+    raise ValueError(
+        "Environment variable DESKTOP_GUI_MCP_SCREENSHOT_QUANTIZE_METHOD must be one of "
+        f"{sorted(_QUANTIZE_METHODS)}."
+    )
+if _quantize_method_raw == "libimagequant" and not features.check_feature("libimagequant"):
+    raise ValueError(
+        "DESKTOP_GUI_MCP_SCREENSHOT_QUANTIZE_METHOD=libimagequant requires a Pillow "
+        "build with libimagequant support."
+    )
+_QUANTIZE_METHOD = _QUANTIZE_METHODS[_quantize_method_raw]
+
+# Palette images keyed by palette size, with the number of captures they served and
+# the remap error they had on the sample they were built from.
+_PALETTE_REFRESH_INTERVAL = 30
+# Screenshots follow UI actions, so consecutive captures can show unrelated scenes; a
+# cached palette is rebuilt early once its remap error (mean absolute difference per
+# RGB channel, 0-255) exceeds the error it was built with by this much.
+_PALETTE_MAX_ERROR_DRIFT = 4.0
+_PALETTE_MIN_PIXELS = 10_000
+_palette_cache: dict[int, tuple[int, Image.Image, float]] = {}
+
+
+def _palette_remap_error(sample, palette_image) -> float:
+    """Return the mean absolute per-channel error of remapping sample onto a palette."""
+
+    remapped = sample.quantize(palette=palette_image, dither=Image.Dither.NONE)
+    difference = ImageChops.difference(sample, remapped.convert("RGB"))
+    return sum(ImageStat.Stat(difference).mean) / 3
+
+
 def _apply_color_mode(
     image,
     color_mode: str,
@@ -249,11 +479,161 @@ def _apply_color_mode(
     if color_mode == "palette":
         palette = palette_size if palette_size is not None else _default_palette_size
         palette = max(2, min(256, int(palette)))
-        return image.convert("RGB").quantize(colors=palette, method=Image.MEDIANCUT).convert("RGB")
+        # Skip quantizing images already within the colour budget, and tiny ones where
+        # the quantizer's fixed cost outweighs any compression gain.
+        if image.mode == "P" and image.getcolors(palette) is not None:
+            return image
+        if image.width * image.height < _PALETTE_MIN_PIXELS:
+            return image.convert("RGB")
+        rgb_image = image.convert("RGB")
+        # Clustering a 1/16-size box-filtered sample picks nearly the same colours at a
+        # fraction of the cost; the full frame is then remapped onto them.
+        sample = rgb_image.reduce(4) if min(rgb_image.size) >= 256 else rgb_image
+        cached = _palette_cache.get(palette)
+        if cached is not None and cached[0] < _PALETTE_REFRESH_INTERVAL:
+            # Remapping onto the previous palette skips the quantizer's clustering pass
+            # while the screen shows similar content; checking the sample's remap error
+            # catches scene changes.
+            uses, palette_image, base_error = cached
+            if _palette_remap_error(sample, palette_image) > base_error + _PALETTE_MAX_ERROR_DRIFT:
+                cached = None
+            else:
+                _palette_cache[palette] = (uses + 1, palette_image, base_error)
+        if cached is None or cached[0] >= _PALETTE_REFRESH_INTERVAL:
+            palette_image = Image.new("P", (1, 1))
+            palette_image.putpalette(
+                sample.quantize(colors=palette, method=_QUANTIZE_METHOD).getpalette()
+            )
+            base_error = _palette_remap_error(sample, palette_image)
+            _palette_cache[palette] = (1, palette_image, base_error)
+        # The encoder expands the palette itself if the output format needs it.
+        return rgb_image.quantize(palette=palette_image, dither=Image.Dither.NONE)
 
     return image
 
 
+_TURBOJPEG_PIXEL_FORMATS = (
+    {"RGB": TJPF_RGB, "RGBA": TJPF_RGBA, "RGBX": TJPF_RGBX, "L": TJPF_GRAY}
+    if TurboJPEG is not None
+    else {}
+)
+
+
+@functools.lru_cache(maxsize=1)
+def _get_turbojpeg():
+    """Load libturbojpeg on the first JPEG encode, or return None to use Pillow."""
+
+    if TurboJPEG is None or np is None:
+        return None
+    try:
+        return TurboJPEG()
+    except Exception as exc:  # noqa: BLE001 - libturbojpeg shared library missing
+        _debug_log(f"TurboJPEG unavailable, using Pillow JPEG encoder: {exc!r}")
+        return None
+
+
+# Quantization tables (natural row-major order) for desktop UI content. The luma table
+# is flatter than libjpeg's photographic Annex K table so the low and mid frequencies
+# that carry glyph strokes survive low qualities; flat UI colours need little chroma.
+_UI_LUMA_QTABLE = (
+    10, 8, 8, 10, 14, 20, 26, 32,
+    8, 8, 9, 12, 16, 24, 30, 32,
+    8, 9, 11, 14, 20, 28, 34, 36,
+    10, 12, 14, 18, 26, 36, 40, 40,
+    14, 16, 20, 26, 34, 44, 48, 48,
+    20, 24, 28, 36, 44, 52, 56, 56,
+    26, 30, 34, 40, 48, 56, 64, 64,
+    32, 32, 36, 40, 48, 56, 64, 72,
+)  # fmt: skip
+_UI_CHROMA_QTABLE = (
+    17, 18, 24, 47, 99, 99, 99, 99,
+    18, 21, 26, 66, 99, 99, 99, 99,
+    24, 26, 56, 99, 99, 99, 99, 99,
+    47, 66, 99, 99, 99, 99, 99, 99,
+    99, 99, 99, 99, 99, 99, 99, 99,
+    99, 99, 99, 99, 99, 99, 99, 99,
+    99, 99, 99, 99, 99, 99, 99, 99,
+    99, 99, 99, 99, 99, 99, 99, 99,
+)  # fmt: skip
+
+
+def _scale_qtable(table: Sequence[int], quality: int) -> list[int]:
+    """Scale a base quantization table the way libjpeg applies its quality setting."""
+
+    scale = 5000 // quality if quality < 50 else 200 - 2 * quality
+    return [max(1, min(255, (value * scale + 50) // 100)) for value in table]
+
+
+def _jpeg_scan_options(pixels: int) -> tuple[bool, bool]:
+    """Return (optimize, progressive) for a JPEG frame of the given pixel count."""
+
+    optimize = _jpeg_optimize
+    if optimize is None:
+        optimize = pixels > _JPEG_OPTIMIZE_MIN_PIXELS
+    progressive = _jpeg_progressive
+    if progressive is None:
+        progressive = pixels > _JPEG_PROGRESSIVE_MIN_PIXELS
+    return optimize, progressive
+
+
+@functools.lru_cache(maxsize=16)
+def _pillow_save_kwargs(
+    image_format: str, quality: int, optimize: bool = False, progressive: bool = False
+) -> dict:
+    save_kwargs: dict[str, object] = {}
+    if image_format == "PNG":
+        # Level 6 is zlib's default; optimize=True (level 9) costs about 4x the time
+        # for a few percent on palette screenshots.
+        save_kwargs["compress_level"] = 6
+        return save_kwargs
+    save_kwargs["quality"] = quality
+    if image_format == "WEBP":
+        # method=0 selects libwebp's fastest encoder settings.
+        save_kwargs["method"] = 0
+    elif image_format == "AVIF":
+        # speed=10 is libavif's fastest preset; slower presets cost seconds per frame.
+        save_kwargs["speed"] = 10
+    else:
+        # 4:2:0 chroma, matching the TurboJPEG path; screenshots gain nothing from
+        # full-resolution colour planes.
+        save_kwargs["subsampling"] = 2
+        if _jpeg_ui_qtables:
+            # Explicit tables replace the quality setting, so they are scaled here.
+            del save_kwargs["quality"]
+            save_kwargs["qtables"] = [
+                _scale_qtable(_UI_LUMA_QTABLE, quality),
+                _scale_qtable(_UI_CHROMA_QTABLE, quality),
+            ]
+        if optimize:
+            save_kwargs["optimize"] = True
+        if progressive:
+            save_kwargs["progressive"] = True
+    return save_kwargs
+
+
+# Each thread keeps one encode buffer and overwrites it in place, so repeated
+# captures do not reallocate a multi-megabyte BytesIO every time.
+_encode_buffers = threading.local()
+
+
+def _get_encode_buffer() -> BytesIO:
+    buffer = getattr(_encode_buffers, "buffer", None)
+    if buffer is None:
+        buffer = _encode_buffers.buffer = BytesIO()
+    buffer.seek(0)
+    return buffer
+
+
+def _output_format(color_mode: str) -> str:
+    """Return the image format used to encode a capture in the given colour mode."""
+
+    # Lossy codecs re-expand a quantized image to full-colour YCbCr and smear its
+    # flat regions, so palette captures are stored losslessly as PNG instead.
+    if color_mode == "palette":
+        return "PNG"
+    return SCREENSHOT_FORMAT
+
+
 def _encode_image_to_base64(
     image,
     quality: Optional[int] = None,
@@ -267,21 +647,285 @@ def _encode_image_to_base64(
     if mode_to_use not in _ALLOWED_COLOR_MODES:
         raise ValueError(f"Unsupported color mode: {mode_to_use}")
 
-    image_to_save = _apply_color_mode(image, mode_to_use, palette_size)
+    image_format = _output_format(mode_to_use)
+    # PyTurboJPEG cannot take custom quantization tables, so those go through Pillow.
+    turbojpeg = (
+        _get_turbojpeg() if image_format == "JPEG" and not _jpeg_ui_qtables else None
+    )
+    if turbojpeg is not None and mode_to_use == "gray":
+        # libjpeg-turbo derives luma during its own colour conversion, so the
+        # separate grayscale pass is skipped.
+        image_to_save = image
+    else:
+        image_to_save = _apply_color_mode(image, mode_to_use, palette_size)
 
-    save_kwargs = {}
     quality_to_use = quality if quality is not None else _default_image_quality
-    save_kwargs["quality"] = max(5, min(95, int(quality_to_use)))
-    save_kwargs["optimize"] = True
-    save_kwargs["progressive"] = True
+    quality_to_use = max(5, min(95, int(quality_to_use)))
+
+    if turbojpeg is not None:
+        # libjpeg-turbo drops the padding/alpha byte inside its colour converter, so
+        # 4-channel captures are encoded without an intermediate RGB copy.
+        pixel_format = _TURBOJPEG_PIXEL_FORMATS.get(image_to_save.mode)
+        if pixel_format is None:
+            image_to_save = image_to_save.convert("RGB")
+            pixel_format = TJPF_RGB
+        if pixel_format == TJPF_GRAY or mode_to_use == "gray":
+            subsample = TJSAMP_GRAY
+        else:
+            subsample = TJSAMP_420
+        image_bytes = turbojpeg.encode(
+            np.asarray(image_to_save),
+            quality=quality_to_use,
+            pixel_format=pixel_format,
+            jpeg_subsample=subsample,
+        )
+        encoded = _b64encode_as_string(image_bytes)
+    else:
+        # Only PNG stores palette images as-is; JPEG and the other codecs need RGB.
+        passthrough_modes = {"RGB", "L", "P"} if image_format == "PNG" else {"RGB", "L"}
+        if image_to_save.mode not in passthrough_modes:
+            image_to_save = image_to_save.convert("RGB")
+
+        optimize, progressive = _jpeg_scan_options(image_to_save.width * image_to_save.height)
+        save_kwargs = _pillow_save_kwargs(image_format, quality_to_use, optimize, progressive)
+        buffer = _get_encode_buffer()
+        image_to_save.save(buffer, format=image_format, **save_kwargs)
+        size = buffer.tell()
+        # getbuffer() exposes the encoded bytes without copying them out of the BytesIO;
+        # the views must be released before the buffer is reused.
+        with buffer.getbuffer() as view, view[:size] as image_bytes:
+            encoded = _b64encode_as_string(image_bytes)
+    return f"data:image/{image_format.lower()};base64,{encoded}"
+
+
+# mss handles are not thread-safe, so each thread lazily opens its own.
+_screen_grabber = threading.local()
+
+
+def _select_monitor(monitors, screen_size: tuple[int, int]):
+    """Return the mss monitor whose geometry matches PyAutoGUI's screen, if any.
+
+    pyautogui.size() is the whole X screen on Linux (monitors[0] in mss) but the
+    primary display on Windows and macOS, which sits at the origin; the order of
+    monitors[1:] is not guaranteed to put the primary one first.
+    """
+
+    for monitor in monitors:
+        if (
+            monitor["left"] == 0
+            and monitor["top"] == 0
+            and (monitor["width"], monitor["height"]) == tuple(screen_size)
+        ):
+            return monitor
+    return None
+
+
+def _is_scaled_capture(frame_size: tuple[int, int], size: tuple[int, int]) -> bool:
+    """Return True when frame_size equals size or an integer HiDPI multiple of it."""
+
+    frame_width, frame_height = frame_size
+    width, height = size
+    if frame_width % width or frame_height % height:
+        return False
+    return frame_width // width == frame_height // height
+
+
+def _grab_frame(
+    screen_size: tuple[int, int], region: Optional[tuple[int, int, int, int]] = None
+):
+    """Grab the screen PyAutoGUI reports (or a region of it) with mss.
+
+    Returns None when mss is unavailable or disabled, when no monitor matches
+    screen_size, or when the frame is not an integer multiple of the logical size,
+    so callers can fall back to PyAutoGUI and keep screenshot and click coordinates
+    aligned.
+    """
+
+    if mss is None or _screenshot_backend != "mss":
+        return None
+    try:
+        sct = getattr(_screen_grabber, "sct", None)
+        if sct is None:
+            sct = _screen_grabber.sct = mss.mss()
+        monitor = _select_monitor(sct.monitors, screen_size)
+        if monitor is None:
+            _debug_log(
+                f"No mss monitor matches the {screen_size[0]}x{screen_size[1]} screen; "
+                "falling back to PyAutoGUI"
+            )
+            return None
+        size = (monitor["width"], monitor["height"])
+        if region is not None:
+            # Only the requested rectangle is copied out of the framebuffer.
+            left, top, width, height = region
+            monitor = {
+                "left": monitor["left"] + left,
+                "top": monitor["top"] + top,
+                "width": width,
+                "height": height,
+            }
+            size = (width, height)
+        frame = sct.grab(monitor)
+    except Exception as exc:  # noqa: BLE001
+        _debug_log(f"mss capture failed, falling back to PyAutoGUI: {exc!r}")
+        return None
+    if not _is_scaled_capture(tuple(frame.size), size):
+        _debug_log(
+            f"mss frame {frame.size[0]}x{frame.size[1]} does not scale to "
+            f"{size[0]}x{size[1]}; falling back to PyAutoGUI"
+        )
+        return None
+    return frame
+
+
+def _frame_to_image(frame):
+    """Convert an mss frame to a PIL RGB image."""
+
+    return Image.frombytes("RGB", frame.size, frame.raw, "raw", "BGRX")
+
+
+def _encode_frame_to_base64(frame, quality: int, color_mode: str) -> Optional[str]:
+    """Encode a raw mss frame with TurboJPEG, or return None if that is not possible."""
+
+    if (
+        SCREENSHOT_FORMAT != "JPEG"
+        or _jpeg_ui_qtables
+        or color_mode not in {"color", "gray"}
+    ):
+        return None
+    turbojpeg = _get_turbojpeg()
+    if turbojpeg is None:
+        return None
+    # The BGRA capture buffer is wrapped in place, so no RGB image is materialised.
+    pixels = np.frombuffer(frame.raw, dtype=np.uint8).reshape(frame.height, frame.width, 4)
+    image_bytes = turbojpeg.encode(
+        pixels,
+        quality=max(5, min(95, int(quality))),
+        pixel_format=TJPF_BGRX,
+        jpeg_subsample=TJSAMP_GRAY if color_mode == "gray" else TJSAMP_420,
+    )
+    return f"data:image/jpeg;base64,{_b64encode_as_string(image_bytes)}"
 
-    if image_to_save.mode not in {"RGB", "L"}:
-        image_to_save = image_to_save.convert("RGB")
 
-    buffer = BytesIO()
-    image_to_save.save(buffer, format=SCREENSHOT_FORMAT, **save_kwargs)
-    encoded = base64.b64encode(buffer.getvalue()).decode("ascii")
-    return f"data:image/{SCREENSHOT_FORMAT.lower()};base64,{encoded}"
+# libjpeg-turbo and Pillow release the GIL while encoding, so the encode of one
+# capture can overlap the next capture on the event loop.
+_encode_pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix="desktop-gui-mcp-encode")
+
+
+# Idle desktops produce identical frames; the last encode is reused when the raw pixels
+# and encoding settings match, so such captures cost a grab and a hash.
+_last_encoded_capture: Optional[tuple[tuple, tuple[str, int, int]]] = None
+_last_encoded_capture_lock = threading.Lock()
+
+
+def _hash_capture(frame):
+    # The mss buffer is hashed in place; zlib.crc32 is several times faster than a
+    # cryptographic digest, and a collision only costs one stale frame.
+    if xxhash is not None:
+        digest = xxhash.xxh3_64_intdigest(frame.raw)
+    else:
+        digest = zlib.crc32(frame.raw)
+    return digest, tuple(frame.size)
+
+
+def _encode_capture(
+    frame,
+    image,
+    size: tuple[int, int],
+    quality: int,
+    color_mode: str,
+    palette_size: Optional[int],
+) -> tuple[str, int, int]:
+    """Scale and encode a capture, returning the data URL and its dimensions."""
+
+    global _last_encoded_capture
+
+    if frame is None:
+        # PIL images cannot be hashed without a full tobytes() copy, so the PyAutoGUI
+        # fallback always encodes.
+        return _encode_capture_uncached(frame, image, size, quality, color_mode, palette_size)
+
+    key = (_hash_capture(frame), size, quality, color_mode, palette_size)
+    with _last_encoded_capture_lock:
+        cached = _last_encoded_capture
+    if cached is not None and cached[0] == key:
+        return cached[1]
+
+    result = _encode_capture_uncached(frame, image, size, quality, color_mode, palette_size)
+    with _last_encoded_capture_lock:
+        _last_encoded_capture = (key, result)
+    return result
+
+
+def _encode_capture_uncached(
+    frame,
+    image,
+    size: tuple[int, int],
+    quality: int,
+    color_mode: str,
+    palette_size: Optional[int],
+) -> tuple[str, int, int]:
+    factor = 1
+    if _screenshot_max_side and max(size) > _screenshot_max_side:
+        factor = -(-max(size) // _screenshot_max_side)
+
+    if frame is not None:
+        if factor == 1 and tuple(frame.size) == size:
+            encoded = _encode_frame_to_base64(frame, quality, color_mode)
+            if encoded is not None:
+                return encoded, *size
+        image = _frame_to_image(frame)
+
+    width, height = image.size
+    if (width, height) != size:
+        # HiDPI grabs are larger than the logical screen; a box filter is exact for
+        # the usual integer ratios and much cheaper than LANCZOS.
+        if width >= size[0] and height >= size[1]:
+            resample = Image.Resampling.BOX
+        else:
+            resample = Image.Resampling.LANCZOS
+        try:
+            image = image.resize(size, resample)
+            width, height = image.size
+        except Exception:  # noqa: BLE001
+            pass
+    if factor > 1:
+        # Integer-factor reduction averages pixel blocks in a single pass, which is
+        # much cheaper than a general resample.
+        image = image.reduce(factor)
+        width, height = image.size
+    encoded = _encode_image_to_base64(
+        image, quality=quality, color_mode=color_mode, palette_size=palette_size
+    )
+    return encoded, width, height
+
+
+_summary_timestamp_cache: tuple[int, str] = (-1, "")
+
+
+def _summary_timestamp() -> str:
+    """Return the current UTC time for summaries, formatted at most once per second."""
+
+    global _summary_timestamp_cache
+    second = int(time.time())
+    cached = _summary_timestamp_cache
+    if cached[0] != second:
+        cached = (second, time.strftime("%Y-%m-%d %H:%M:%S", time.gmtime(second)))
+        _summary_timestamp_cache = cached
+    return cached[1]
+
+
+# Bumped by every tool that sends input so cached screenshots are never served
+# after the UI may have changed.
+_input_generation = 0
+_last_screenshot: Optional[
+    tuple[float, int, Optional[tuple[int, int, int, int]], "ToolResponse"]
+] = None
+
+
+def _note_input_event() -> None:
+    global _input_generation
+    _input_generation += 1
 
 
 def _build_response(
@@ -317,28 +961,44 @@ _KEY_ALIASES = {
 _VALID_KEYS = set(getattr(pyautogui, "KEYBOARD_KEYS", []))
 
 
+# Every accepted spelling (canonical names and aliases) mapped to the name pyautogui
+# expects, so already-canonical input resolves with a single dictionary probe.
+_KEY_TABLE = {key: key for key in _VALID_KEYS if key and key == key.strip().lower()}
+_KEY_TABLE.update(
+    (alias, target)
+    for alias, target in {**_KEY_ALIASES, " ": "space"}.items()
+    if not _VALID_KEYS or target in _VALID_KEYS
+)
+
+
+@functools.lru_cache(maxsize=512)
 def _normalize_key_name(key: str) -> str:
+    try:
+        return _KEY_TABLE[key]
+    except KeyError:
+        pass
+
     if not isinstance(key, str):
         raise TypeError("Key names must be strings.")
 
-    if key == " ":
-        normalized_key = "space"
-    else:
-        stripped = key.strip()
-        if not stripped:
-            raise ValueError("Key names must not be empty.")
-        normalized_key = stripped.lower()
-        normalized_key = _KEY_ALIASES.get(normalized_key, normalized_key)
-
-    if _VALID_KEYS and normalized_key not in _VALID_KEYS:
-        if len(normalized_key) == 1:
-            return normalized_key
+    normalized_key = key.strip().lower()
+    if not normalized_key:
+        raise ValueError("Key names must not be empty.")
+
+    canonical_key = _KEY_TABLE.get(normalized_key)
+    if canonical_key is not None:
+        return canonical_key
+
+    if _VALID_KEYS and len(normalized_key) != 1:
         raise ValueError(f"Unsupported key for this platform: {normalized_key}")
 
     return normalized_key
 
 
 def _normalize_keys(keys: Sequence[str]) -> list[str]:
+    # Checked before the cached lookup so unhashable values get the same error.
+    if not all(isinstance(key, str) for key in keys):
+        raise TypeError("Key names must be strings.")
     return [_normalize_key_name(key) for key in keys]
 
 
@@ -372,35 +1032,114 @@ def _keys_to_text(keys: Sequence[str]) -> Optional[str]:
     return "".join(text_chars)
 
 
+@functools.lru_cache(maxsize=1)
+def _get_quartz():
+    """Import PyObjC's Quartz bindings on first use; loading them is slow."""
+
+    if sys.platform != "darwin":  # pragma: no cover - platform specific
+        return None
+    try:
+        import Quartz  # type: ignore[import-not-found]  # noqa: PLC0415
+    except Exception:  # noqa: BLE001
+        return None
+    return Quartz
+
+
+@functools.lru_cache(maxsize=1)
+def _get_quartz_keyboard():
+    """Bind the Quartz keyboard-event functions once, so typing skips PyObjC lookups.
+
+    Returns (create_event, set_unicode_string, post_event, event_tap, event_source), or
+    None when Quartz is unavailable.
+    """
+
+    quartz = _get_quartz()
+    if quartz is None:
+        return None
+    try:
+        event_source = quartz.CGEventSourceCreate(quartz.kCGEventSourceStateHIDSystemState)
+    except Exception:  # noqa: BLE001
+        event_source = None
+    try:
+        return (
+            quartz.CGEventCreateKeyboardEvent,
+            quartz.CGEventKeyboardSetUnicodeString,
+            quartz.CGEventPost,
+            quartz.kCGHIDEventTap,
+            event_source,
+        )
+    except AttributeError:
+        return None
+
+
+def _split_utf16_chunks(text: str, max_units: int) -> list[str]:
+    """Split text into chunks of at most max_units UTF-16 code units, keeping surrogate pairs."""
+
+    chunks: list[str] = []
+    start = 0
+    units = 0
+    for index, char in enumerate(text):
+        char_units = 2 if ord(char) > 0xFFFF else 1
+        if units + char_units > max_units:
+            chunks.append(text[start:index])
+            start = index
+            units = 0
+        units += char_units
+    if start < len(text):
+        chunks.append(text[start:])
+    return chunks
+
+
 def _type_text_macos_layout_aware(text: str, interval: float) -> bool:
-    if Quartz is None:
+    quartz_keyboard = _get_quartz_keyboard()
+    if quartz_keyboard is None:
         return _type_text_macos_via_osascript(text, interval)
 
+    create_event, set_unicode_string, post_event, event_tap, event_source = quartz_keyboard
+    # With no explicit interval, text is posted in chunks of up to 20 UTF-16 units (the
+    # most a single keyboard event carries) instead of one event pair per character.
+    chunks = list(text) if interval > 0 else _split_utf16_chunks(text, 20)
     try:
-        for index, char in enumerate(text):
-            event_down = Quartz.CGEventCreateKeyboardEvent(None, 0, True)
-            Quartz.CGEventKeyboardSetUnicodeString(event_down, len(char), char)
-            Quartz.CGEventPost(Quartz.kCGHIDEventTap, event_down)
-
-            event_up = Quartz.CGEventCreateKeyboardEvent(None, 0, False)
-            Quartz.CGEventKeyboardSetUnicodeString(event_up, len(char), char)
-            Quartz.CGEventPost(Quartz.kCGHIDEventTap, event_up)
-
-            if index < len(text) - 1:
-                sleep_interval = interval if interval > 0 else pyautogui.PAUSE
-                if sleep_interval > 0:
-                    time.sleep(sleep_interval)
+        # One down/up pair is reused for every chunk; only its Unicode payload changes.
+        event_down = create_event(event_source, 0, True)
+        event_up = create_event(event_source, 0, False)
+        for index, chunk in enumerate(chunks):
+            length = len(chunk.encode("utf-16-le")) // 2
+            set_unicode_string(event_down, length, chunk)
+            post_event(event_tap, event_down)
+
+            set_unicode_string(event_up, length, chunk)
+            post_event(event_tap, event_up)
+
+            if index < len(chunks) - 1 and interval > 0:
+                time.sleep(interval)
     except Exception:  # noqa: BLE001
         return _type_text_macos_via_osascript(text, interval)
 
+    if interval <= 0 and pyautogui.PAUSE > 0:
+        time.sleep(pyautogui.PAUSE)
     return True
 
 
+# The text is passed as a script argument rather than spliced into the source, so the
+# command line is fixed and needs no AppleScript escaping. osascript only runs a script
+# once stdin reaches EOF, so a long-lived process cannot be fed one keystroke at a time.
+_OSASCRIPT_KEYSTROKE_ARGS = (
+    "osascript",
+    "-e",
+    "on run argv",
+    "-e",
+    'tell application "System Events" to keystroke (item 1 of argv)',
+    "-e",
+    "end run",
+    # Ends option parsing so text starting with "-" is passed through as argv.
+    "--",
+)
+
+
 def _type_text_macos_via_osascript(text: str, interval: float) -> bool:
-    escaped = text.replace("\\", "\\\\").replace('"', '\\"')
-    script = f'tell application "System Events" to keystroke "{escaped}"'
     try:
-        subprocess.run(["osascript", "-e", script], check=True)
+        subprocess.run([*_OSASCRIPT_KEYSTROKE_ARGS, text], check=True)
     except (FileNotFoundError, subprocess.CalledProcessError):
         return False
 
@@ -411,22 +1150,36 @@ def _type_text_macos_via_osascript(text: str, interval: float) -> bool:
     return True
 
 
-def _type_text_windows_layout_aware(text: str, interval: float) -> bool:
+_INPUT_KEYBOARD = 1
+_KEYEVENTF_UNICODE = 0x0004
+_KEYEVENTF_KEYUP = 0x0002
+
+
+@functools.lru_cache(maxsize=1)
+def _get_windows_send_input():
+    """Return (SendInput, INPUT, sizeof(INPUT)) for Unicode typing, or None off Windows.
+
+    The INPUT structures and SendInput's ctypes prototype are built once instead of on
+    every call.
+    """
+
     if not sys.platform.startswith(("win", "cygwin")):
-        return False
+        return None
     try:
         import ctypes  # noqa: PLC0415
         from ctypes import wintypes  # noqa: PLC0415
     except Exception:  # noqa: BLE001
-        return False
-
-    user32 = ctypes.windll.user32  # type: ignore[attr-defined]
-    if not user32:
-        return False
+        return None
 
-    INPUT_KEYBOARD = 1
-    KEYEVENTF_UNICODE = 0x0004
-    KEYEVENTF_KEYUP = 0x0002
+    class MOUSEINPUT(ctypes.Structure):
+        _fields_ = [
+            ("dx", wintypes.LONG),
+            ("dy", wintypes.LONG),
+            ("mouseData", wintypes.DWORD),
+            ("dwFlags", wintypes.DWORD),
+            ("time", wintypes.DWORD),
+            ("dwExtraInfo", ctypes.c_size_t),  # ULONG_PTR
+        ]
 
     class KEYBDINPUT(ctypes.Structure):
         _fields_ = [
@@ -434,32 +1187,78 @@ def _type_text_windows_layout_aware(text: str, interval: float) -> bool:
             ("wScan", wintypes.WORD),
             ("dwFlags", wintypes.DWORD),
             ("time", wintypes.DWORD),
-            ("dwExtraInfo", wintypes.ULONG_PTR),
+            ("dwExtraInfo", ctypes.c_size_t),  # ULONG_PTR
         ]
 
+    # SendInput validates cbSize against the full INPUT union, whose largest
+    # member is MOUSEINPUT.
+    class _INPUTUNION(ctypes.Union):
+        _fields_ = [("mi", MOUSEINPUT), ("ki", KEYBDINPUT)]
+
     class INPUT(ctypes.Structure):
+        _anonymous_ = ("u",)
         _fields_ = [
             ("type", wintypes.DWORD),
-            ("ki", KEYBDINPUT),
+            ("u", _INPUTUNION),
         ]
 
-    sleep_interval = interval if interval > 0 else pyautogui.PAUSE
+    try:
+        # A private handle keeps this prototype from clashing with PyAutoGUI's own
+        # untyped SendInput calls through ctypes.windll.user32.
+        user32 = ctypes.WinDLL("user32")  # type: ignore[attr-defined]
+    except Exception:  # noqa: BLE001
+        return None
+    send_input = user32.SendInput
+    send_input.argtypes = (wintypes.UINT, ctypes.POINTER(INPUT), ctypes.c_int)
+    send_input.restype = wintypes.UINT
+    return send_input, INPUT, ctypes.sizeof(INPUT)
 
-    for index, char in enumerate(text):
-        code = ord(char)
-        down = INPUT(type=INPUT_KEYBOARD, ki=KEYBDINPUT(0, code, KEYEVENTF_UNICODE, 0, 0))
-        up = INPUT(
-            type=INPUT_KEYBOARD,
-            ki=KEYBDINPUT(0, code, KEYEVENTF_UNICODE | KEYEVENTF_KEYUP, 0, 0),
-        )
-        if user32.SendInput(1, ctypes.byref(down), ctypes.sizeof(INPUT)) == 0:
-            return False
-        if user32.SendInput(1, ctypes.byref(up), ctypes.sizeof(INPUT)) == 0:
-            return False
 
-        if index < len(text) - 1 and sleep_interval > 0:
-            time.sleep(sleep_interval)
+def _type_text_windows_layout_aware(text: str, interval: float) -> bool:
+    windows_api = _get_windows_send_input()
+    if windows_api is None:
+        return False
+    send_input, INPUT, input_size = windows_api
+
+    # UTF-16 code units, so characters outside the BMP become surrogate pairs.
+    codes = memoryview(text.encode("utf-16-le")).cast("H")
+    if not codes:
+        return True
+
+    if interval > 0:
+        down = INPUT(type=_INPUT_KEYBOARD)
+        down.ki.dwFlags = _KEYEVENTF_UNICODE
+        up = INPUT(type=_INPUT_KEYBOARD)
+        up.ki.dwFlags = _KEYEVENTF_UNICODE | _KEYEVENTF_KEYUP
+        for index, code in enumerate(codes):
+            down.ki.wScan = code
+            up.ki.wScan = code
+            if send_input(1, down, input_size) != 1:
+                return False
+            if send_input(1, up, input_size) != 1:
+                return False
+            if index < len(codes) - 1:
+                time.sleep(interval)
+        return True
+
+    # Without a per-character delay the whole burst goes through a single SendInput call.
+    events = (INPUT * (2 * len(codes)))()
+    for index, code in enumerate(codes):
+        down = events[2 * index]
+        down.type = _INPUT_KEYBOARD
+        down.ki.wScan = code
+        down.ki.dwFlags = _KEYEVENTF_UNICODE
+        up = events[2 * index + 1]
+        up.type = _INPUT_KEYBOARD
+        up.ki.wScan = code
+        up.ki.dwFlags = _KEYEVENTF_UNICODE | _KEYEVENTF_KEYUP
+    # SendInput reports how many events it inserted; a short count means input was
+    # blocked part-way (for example by UIPI).
+    if send_input(len(events), events, input_size) != len(events):
+        return False
 
+    if pyautogui.PAUSE > 0:
+        time.sleep(pyautogui.PAUSE)
     return True
 
 
@@ -487,20 +1286,56 @@ def _type_text_linux_layout_aware(text: str, interval: float) -> bool:
     return True
 
 
-def _type_text_clipboard_fallback(text: str, interval: float) -> bool:
+@functools.lru_cache(maxsize=1)
+def _get_clipboard():
+    """Return (copy, paste) clipboard functions, or None when none are available.
+
+    macOS uses NSPasteboard in-process; elsewhere pyperclip is used.
+    """
+
+    if sys.platform == "darwin":  # pragma: no cover - platform specific
+        try:
+            from AppKit import (  # type: ignore[import-not-found]  # noqa: PLC0415
+                NSPasteboard,
+                NSPasteboardTypeString,
+            )
+        except Exception:  # noqa: BLE001
+            pass
+        else:
+            pasteboard = NSPasteboard.generalPasteboard()
+
+            def copy(text: str) -> None:
+                pasteboard.clearContents()
+                if not pasteboard.setString_forType_(text, NSPasteboardTypeString):
+                    raise RuntimeError("NSPasteboard rejected the text.")
+
+            def paste() -> Optional[str]:
+                return pasteboard.stringForType_(NSPasteboardTypeString)
+
+            return copy, paste
+
     try:
         import pyperclip  # noqa: PLC0415
     except Exception:  # noqa: BLE001
+        return None
+    return pyperclip.copy, pyperclip.paste
+
+
+def _type_text_clipboard_fallback(text: str, interval: float) -> bool:
+    clipboard = _get_clipboard()
+    if clipboard is None:
         return False
+    copy, paste = clipboard
 
-    previous_contents: Optional[str]
-    try:
-        previous_contents = pyperclip.paste()
-    except Exception:  # noqa: BLE001
-        previous_contents = None
+    previous_contents: Optional[str] = None
+    if _clipboard_preserve:
+        try:
+            previous_contents = paste()
+        except Exception:  # noqa: BLE001
+            previous_contents = None
 
     try:
-        pyperclip.copy(text)
+        copy(text)
     except Exception:  # noqa: BLE001
         return False
 
@@ -512,7 +1347,7 @@ def _type_text_clipboard_fallback(text: str, interval: float) -> bool:
     finally:
         if previous_contents is not None:
             try:
-                pyperclip.copy(previous_contents)
+                copy(previous_contents)
             except Exception:  # noqa: BLE001
                 pass
 
@@ -539,10 +1374,31 @@ def _type_text_with_layout_awareness(text: str, interval: float) -> None:
         pyautogui.write(text, interval=interval)
 
 
+# (mtime_ns, size) of the HIToolbox plist and the layout parsed from it.
+_macos_layout_plist_cache: Optional[tuple[tuple[int, int], Optional[dict[str, str]]]] = None
+
+
 def _detect_keyboard_layout_macos() -> Optional[dict[str, str]]:
+    global _macos_layout_plist_cache
+
     plist_path = os.path.expanduser("~/Library/Preferences/com.apple.HIToolbox.plist")
-    if not os.path.exists(plist_path):
+    try:
+        plist_stat = os.stat(plist_path)
+    except OSError:
         return None
+
+    # The plist is only re-parsed after macOS rewrites it on a layout switch.
+    signature = (plist_stat.st_mtime_ns, plist_stat.st_size)
+    cached = _macos_layout_plist_cache
+    if cached is not None and cached[0] == signature:
+        return cached[1]
+
+    layout_info = _parse_keyboard_layout_plist(plist_path)
+    _macos_layout_plist_cache = (signature, layout_info)
+    return layout_info
+
+
+def _parse_keyboard_layout_plist(plist_path: str) -> Optional[dict[str, str]]:
     try:
         with open(plist_path, "rb") as plist_file:
             plist_data = plistlib.load(plist_file)
@@ -592,7 +1448,6 @@ def _detect_keyboard_layout_macos() -> Optional[dict[str, str]]:
 def _detect_keyboard_layout_windows() -> Optional[dict[str, str]]:
     try:
         import ctypes  # noqa: PLC0415
-        import locale  # noqa: PLC0415
     except Exception:  # noqa: BLE001
         return None
 
@@ -604,6 +1459,15 @@ def _detect_keyboard_layout_windows() -> Optional[dict[str, str]]:
     if not layout_handle:
         return None
 
+    return _describe_keyboard_layout_windows(layout_handle)
+
+
+@functools.lru_cache(maxsize=8)
+def _describe_keyboard_layout_windows(layout_handle: int) -> dict[str, str]:
+    """Describe an HKL; memoized because users switch between only a few layouts."""
+
+    import locale  # noqa: PLC0415
+
     language_id = layout_handle & 0xFFFF
     locale_name = locale.windows_locale.get(language_id)
     language_code = locale_name.split("_", 1)[0] if locale_name else None
@@ -651,7 +1515,24 @@ def _detect_keyboard_layout_linux() -> Optional[dict[str, str]]:
     return result
 
 
+# Layouts only change on user action, so detection results are reused for a short
+# while instead of re-reading plists or spawning setxkbmap on every call.
+_layout_cache: Optional[tuple[float, Optional[dict[str, str]]]] = None
+
+
 def _detect_keyboard_layout() -> Optional[dict[str, str]]:
+    global _layout_cache
+    now = time.monotonic()
+    cached = _layout_cache
+    if cached is not None and now - cached[0] < _layout_cache_ttl:
+        return cached[1]
+
+    layout_info = _query_keyboard_layout()
+    _layout_cache = (now, layout_info)
+    return layout_info
+
+
+def _query_keyboard_layout() -> Optional[dict[str, str]]:
     platform = sys.platform
     if platform == "darwin":
         return _detect_keyboard_layout_macos()
@@ -671,6 +1552,7 @@ def move_mouse(
     with _tool_debug_context(
         "desktop_move_mouse", {"x": x, "y": y, "duration": duration}
     ) as debug_ctx:
+        _note_input_event()
         pyautogui.moveTo(x, y, duration=duration)
         summary = f"Moved cursor to ({x:.1f}, {y:.1f}) over {duration:.2f}s."
         return debug_ctx.finish(_build_response(summary))
@@ -694,6 +1576,7 @@ def click(
         "interval": interval,
     }
     with _tool_debug_context("desktop_mouse_click", payload) as debug_ctx:
+        _note_input_event()
         pyautogui.click(x=x, y=y, clicks=clicks, interval=interval, button=button)
         if x is not None and y is not None:
             position_str = f" at ({x:.1f}, {y:.1f})"
@@ -724,6 +1607,7 @@ def drag(
         "button": button,
     }
     with _tool_debug_context("desktop_mouse_drag", payload) as debug_ctx:
+        _note_input_event()
         if start_x is not None and start_y is not None:
             pyautogui.moveTo(start_x, start_y)
 
@@ -741,11 +1625,12 @@ def type_text(
     """Type the given text using the keyboard."""
 
     payload = {
-        "text": _truncate_text(text),
+        "text": _truncate_text(text) if _debug_enabled else text,
         "interval": interval,
         "press_enter": press_enter,
     }
     with _tool_debug_context("desktop_type_text", payload) as debug_ctx:
+        _note_input_event()
         _type_text_with_layout_awareness(text, interval)
         if press_enter:
             pyautogui.press("enter")
@@ -774,6 +1659,7 @@ def press_keys(
         "interval": interval,
     }
     with _tool_debug_context("desktop_press_keys", payload) as debug_ctx:
+        _note_input_event()
         if as_hotkey:
             _press_hotkey(normalized_keys, interval)
             summary = f"Pressed hotkey combination: {' + '.join(normalized_keys)}."
@@ -819,46 +1705,82 @@ def get_screen_size() -> ToolResponse:
 
 
 @mcp_server.tool(name="desktop_capture_screenshot")
-def screenshot() -> ToolResponse:
+async def screenshot(
+    left: Annotated[Optional[int], "Left edge of the capture area in screen pixels"] = None,
+    top: Annotated[Optional[int], "Top edge of the capture area in screen pixels"] = None,
+    width: Annotated[
+        Optional[int], "Width of the capture area; full screen if omitted"
+    ] = None,
+    height: Annotated[
+        Optional[int], "Height of the capture area; full screen if omitted"
+    ] = None,
+) -> ToolResponse:
     """Capture a screenshot and return its base64 representation along with the image dimensions."""
 
-    with _tool_debug_context("desktop_capture_screenshot", {}) as debug_ctx:
+    global _last_screenshot
+
+    payload = {"left": left, "top": top, "width": width, "height": height}
+    with _tool_debug_context("desktop_capture_screenshot", payload) as debug_ctx:
+        region_to_use: Optional[tuple[int, int, int, int]] = None
+        if width is not None or height is not None or left is not None or top is not None:
+            if width is None or height is None:
+                raise ValueError("Both width and height are required to capture a region.")
+            if width <= 0 or height <= 0:
+                raise ValueError("Region width and height must be positive.")
+            region_to_use = (left or 0, top or 0, width, height)
+        cached = _last_screenshot
+        if (
+            cached is not None
+            and cached[1] == _input_generation
+            and cached[2] == region_to_use
+            and time.monotonic() - cached[0] < _screenshot_cache_ttl
+        ):
+            return debug_ctx.finish(cached[3])
+
+        captured_at = time.monotonic()
+        captured_generation = _input_generation
+        screenshot_image = None
+        screen_size = pyautogui.size()
         try:
-            screenshot_image = pyautogui.screenshot()
+            frame = _grab_frame(screen_size, region_to_use)
+            if frame is None:
+                screenshot_image = pyautogui.screenshot(region=region_to_use)
         except Exception as exc:  # noqa: BLE001
             raise RuntimeError(
                 "Unable to capture a screenshot. Ensure Pillow and PyScreeze are installed "
                 "(try `pip install pillow pyscreeze`)."
             ) from exc
-        screen_width, screen_height = pyautogui.size()
-        screenshot_width, screenshot_height = screenshot_image.size
-        if (screenshot_width, screenshot_height) != (screen_width, screen_height):
-            try:
-                screenshot_image = screenshot_image.resize(
-                    (screen_width, screen_height), Image.Resampling.LANCZOS
-                )
-                screenshot_width, screenshot_height = screenshot_image.size
-            except Exception:  # noqa: BLE001
-                pass
+        if region_to_use is not None:
+            screen_width, screen_height = region_to_use[2:]
+        else:
+            screen_width, screen_height = screen_size
         mode_to_use = _default_color_mode
         quality_to_use = _default_image_quality
         palette_to_use: Optional[int] = None
 
-        screenshot_b64 = _encode_image_to_base64(
-            screenshot_image,
-            quality=quality_to_use,
-            color_mode=mode_to_use,
-            palette_size=palette_to_use,
+        screenshot_b64, screenshot_width, screenshot_height = await asyncio.wrap_future(
+            _encode_pool.submit(
+                _encode_capture,
+                frame,
+                screenshot_image,
+                (screen_width, screen_height),
+                quality_to_use,
+                mode_to_use,
+                palette_to_use,
+            )
         )
-        timestamp = datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S")
+        timestamp = _summary_timestamp()
 
         summary_parts: list[str] = []
-        quality_logged = max(5, min(95, int(_default_image_quality)))
+        summary_parts.append(f"format={_output_format(mode_to_use).lower()}")
         summary_parts.append(f"mode={mode_to_use}")
-        summary_parts.append(f"quality={quality_logged}")
+        if mode_to_use != "palette":
+            summary_parts.append(f"quality={quality_to_use}")
         if mode_to_use == "palette":
             palette_detail = _default_palette_size
             summary_parts.append(f"palette={palette_detail}")
+        if screenshot_width < screen_width:
+            summary_parts.append(f"downscaled_from={screen_width}x{screen_height}")
 
         details_str = "; ".join(summary_parts)
         summary = f"Captured screenshot at {timestamp}"
@@ -873,13 +1795,15 @@ def screenshot() -> ToolResponse:
             dimensions=(screenshot_width, screenshot_height),
         )
 
+        _last_screenshot = (captured_at, captured_generation, region_to_use, response)
+
         debug_metadata = {
             "width": screenshot_width,
             "height": screenshot_height,
             "mode": mode_to_use,
-            "quality": quality_logged,
+            "quality": quality_to_use if mode_to_use != "palette" else None,
             "palette": _default_palette_size if mode_to_use == "palette" else None,
-            "region": None,
+            "region": list(region_to_use) if region_to_use is not None else None,
         }
 
         return debug_ctx.finish(response, metadata=debug_metadata)